@@ -1,8 +1,10 @@
+import threading
+import time
+
 import streamlit as st
 import pandas as pd
-import psycopg2
+import duckdb
 import plotly.express as px
-from collections import Counter
 
 # --- Configuração da Página ---
 st.set_page_config(
@@ -11,84 +13,349 @@ st.set_page_config(
     layout="wide"
 )
 
-# --- Conexão com o Banco de Dados ---
+# --- Cache Local (DuckDB) ---
+DUCKDB_PATH = "cache.duckdb"
+CACHE_TTL = 600
+# Intervalo mínimo entre tentativas de recarga após uma falha no PostgreSQL.
+REFRESH_RETRY_DELAY = 60
+
+# Limita as linhas da tabela de dados brutos renderizadas no navegador.
+RAW_PREVIEW_ROWS = 500
+
+# Define a ordem das respostas para os gráficos de frequência.
+ORDER_MAP = ("Nunca", "Raramente", "Ocasionalmente", "Frequentemente", "Muito frequentemente")
+FREQ_ENUM_DDL = (
+    "CREATE TYPE IF NOT EXISTS frequencia AS ENUM ("
+    + ", ".join(f"'{v}'" for v in ORDER_MAP) + ");"
+)
+
+# Colunas copiadas do PostgreSQL para o cache; as de frequência viram o ENUM `frequencia`.
+USED_COLS = (
+    "universidade", "curso", "acesso_leitura_comunidade", "equipamentos_utilizados",
+    "acesso_internet_comunidade", "avaliacao_tecnologia_universidade",
+    "frequencia_acesso_geral", "frequencia_leitura_textos_longos",
+    "justificativa_leitura_longa", "experiencia_antes_depois", "comunidade_natal",
+)
+FREQ_COLS = ("frequencia_acesso_geral", "frequencia_leitura_textos_longos")
+
+# Colunas contadas na tabela `dashboard_aggs`: as de resposta única e as de
+# várias respostas separadas por vírgula.
+SINGLE_COLS = (
+    "universidade", "curso", "acesso_internet_comunidade", "avaliacao_tecnologia_universidade",
+    "frequencia_acesso_geral", "frequencia_leitura_textos_longos", "comunidade_natal",
+)
+MULTI_COLS = ("acesso_leitura_comunidade", "equipamentos_utilizados")
+
+# Pré-agrega, a cada recarga do cache, todas as contagens exibidas no
+# dashboard como linhas (coluna, valor, n). As colunas de frequência recebem
+# todas as opções do ENUM, com zero quando não houver respostas.
+DASHBOARD_AGGS_SQL = (
+    "CREATE OR REPLACE TABLE dashboard_aggs AS "
+    "SELECT coluna, valor, SUM(n)::BIGINT AS n FROM ("
+    "SELECT coluna, valor, 1 AS n FROM ("
+    "UNPIVOT (SELECT " + ", ".join(f"{c}::VARCHAR AS {c}" for c in SINGLE_COLS)
+    + " FROM respostas_questionario_quilombola) "
+    "ON COLUMNS(*) INTO NAME coluna VALUE valor) "
+    "UNION ALL "
+    "SELECT coluna, trim(valor) AS valor, 1 AS n FROM ("
+    "SELECT coluna, unnest(string_split(lista, ',')) AS valor FROM ("
+    "UNPIVOT (SELECT " + ", ".join(MULTI_COLS) + " FROM respostas_questionario_quilombola) "
+    "ON COLUMNS(*) INTO NAME coluna VALUE lista)) "
+    "UNION ALL "
+    "SELECT coluna, unnest(enum_range(NULL::frequencia)) AS valor, 0 AS n "
+    "FROM (VALUES " + ", ".join(f"('{c}')" for c in FREQ_COLS) + ") AS c(coluna)"
+    ") GROUP BY 1, 2;"
+)
+
+@st.cache_resource
 def init_connection():
-    """Inicializa a conexão com o banco de dados PostgreSQL."""
+    """Abre uma única conexão com o cache DuckDB, compartilhada entre sessões.
+
+    Cada consulta usa o seu próprio `cursor()`, que é seguro entre threads.
+    """
+    return duckdb.connect(DUCKDB_PATH)
+
+def _attach_postgres(duck):
+    """Anexa o PostgreSQL como catálogo `pg`, cujas conexões o DuckDB reaproveita."""
+    duck.execute("INSTALL postgres; LOAD postgres;")
+    url = st.secrets["postgres"]["url"].replace("'", "''")
+    duck.execute(f"ATTACH IF NOT EXISTS '{url}' AS pg (TYPE postgres, READ_ONLY);")
+
+def _loaded_at(duck):
+    """Retorna quando os dados locais foram recarregados, ou None se ainda não houver cópia."""
+    if duck.execute(
+        "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = 'cache_meta';"
+    ).fetchone()[0] == 0:
+        return None
+    row = duck.execute("SELECT loaded_at FROM cache_meta;").fetchone()
+    return row[0] if row else None
+
+def _load_from_postgres(duck):
+    """Recarrega a tabela e as agregações numa transação, preservando a cópia anterior em caso de falha.
+
+    Retorna o `loaded_at` gravado em `cache_meta` na mesma transação.
+    """
+    _attach_postgres(duck)
+    loaded_at = time.time()
+    duck.begin()
+    try:
+        duck.execute(FREQ_ENUM_DDL)
+        duck.execute(
+            "CREATE OR REPLACE TABLE respostas_questionario_quilombola AS SELECT "
+            + ", ".join(
+                f"TRY_CAST({c} AS frequencia) AS {c}" if c in FREQ_COLS else c
+                for c in USED_COLS
+            )
+            + " FROM pg.public.respostas_questionario_quilombola;"
+        )
+        duck.execute(DASHBOARD_AGGS_SQL)
+        duck.execute("CREATE OR REPLACE TABLE cache_meta AS SELECT ?::DOUBLE AS loaded_at;", [loaded_at])
+        duck.commit()
+    except BaseException:
+        duck.rollback()
+        raise
+    return loaded_at
+
+@st.cache_resource
+def _refresh_state():
+    """Guarda, para todo o processo, o lock da recarga e a última falha."""
+    return {"lock": threading.Lock(), "failed_at": 0.0, "error": None}
+
+def refresh_cache():
+    """Copia a tabela do PostgreSQL para o DuckDB e refaz as agregações quando o cache expira.
+
+    Se o PostgreSQL estiver indisponível, continua servindo a cópia local
+    existente e só tenta de novo após REFRESH_RETRY_DELAY segundos. Retorna
+    o `loaded_at` da cópia local, usado como versão dos dados na chave de
+    `run_query`, ou None se ainda não houver dados locais.
+    """
+    state = _refresh_state()
+    with state["lock"]:
+        loaded_at = None
+        try:
+            with init_connection().cursor() as duck:
+                loaded_at = _loaded_at(duck)
+                expired = loaded_at is None or time.time() - loaded_at > CACHE_TTL
+                can_retry = time.time() - state["failed_at"] > REFRESH_RETRY_DELAY
+                if expired and can_retry:
+                    try:
+                        loaded_at = _load_from_postgres(duck)
+                        state["failed_at"], state["error"] = 0.0, None
+                    except (duckdb.Error, KeyError) as e:
+                        state["failed_at"], state["error"] = time.time(), e
+        except duckdb.Error as e:
+            state["error"] = e
+        if loaded_at is None:
+            st.error(f"Não foi possível conectar ao banco de dados: {state['error']}")
+        return loaded_at
+
+def refresh_error():
+    """Retorna o erro da última recarga que falhou, ou None se a cópia local estiver em dia."""
+    return _refresh_state()["error"]
+
+@st.cache_data(ttl=CACHE_TTL)
+def run_query(query, cache_version):
+    """Executa uma consulta no cache DuckDB e retorna os resultados como um DataFrame.
+
+    O `cache_version` faz parte da chave do cache, invalidando os resultados
+    sempre que a cópia local é recarregada do PostgreSQL. O resultado
+    chega em Arrow e é mantido com tipos `pd.ArrowDtype`, sem passar por
+    objetos Python linha a linha.
+    """
+    if cache_version is None:
+        return pd.DataFrame()
+    with init_connection().cursor() as duck:
+        table = duck.execute(query).to_arrow_table()
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+@st.cache_data(ttl=CACHE_TTL)
+def run_query_full():
+    """Busca todas as colunas direto do PostgreSQL, apenas para a tabela de dados brutos."""
     try:
-        conn = psycopg2.connect(st.secrets["postgres"]["url"])
-        return conn
-    except (psycopg2.OperationalError, KeyError) as e:
+        with init_connection().cursor() as duck:
+            _attach_postgres(duck)
+            table = duck.execute("SELECT * FROM pg.public.respostas_questionario_quilombola;").to_arrow_table()
+    except (duckdb.Error, KeyError) as e:
         st.error(f"Não foi possível conectar ao banco de dados: {e}")
-        return None
+        return pd.DataFrame()
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
 
-@st.cache_data(ttl=600)
-def run_query(query):
-    """Executa uma consulta e retorna os resultados como um DataFrame."""
-    conn = init_connection()
-    if conn:
-        with conn:
-            return pd.read_sql_query(query, conn)
-    return pd.DataFrame()
+@st.cache_data(ttl=CACHE_TTL)
+def raw_data_csv():
+    """Gera o CSV da tabela completa para download."""
+    return run_query_full().to_csv(index=False).encode("utf-8")
 
-# --- Carregamento dos Dados ---
-df = run_query("SELECT * FROM respostas_questionario_quilombola;")
+# --- Consultas Agregadas ---
+def get_dashboard_aggs():
+    """Lê todas as contagens pré-agregadas do dashboard numa única consulta.
+
+    Retorna uma Series indexada por (coluna, valor). As colunas de frequência
+    vêm na ordem do ENUM; as demais em ordem decrescente de quantidade.
+    """
+    counts = run_query(
+        "SELECT coluna, valor, n FROM dashboard_aggs ORDER BY coluna, "
+        "CASE WHEN coluna IN (" + ", ".join(f"'{c}'" for c in FREQ_COLS) + ") "
+        "THEN TRY_CAST(valor AS frequencia) END, n DESC, valor;",
+        refresh_cache(),
+    )
+    if counts.empty:
+        return pd.Series(dtype="int64")
+    return counts.set_index(['coluna', 'valor'])['n']
+
+def column_counts(counts_all, col):
+    """Separa as contagens de uma coluna; fica vazia se a coluna não tiver respostas."""
+    return counts_all[counts_all.index.get_level_values('coluna') == col].droplevel('coluna')
+
+def media_geral_respostas():
+    """Calcula no banco a média de respostas por comunidade natal."""
+    media = run_query(
+        "SELECT AVG(n) AS media FROM dashboard_aggs WHERE coluna = 'comunidade_natal';",
+        refresh_cache(),
+    )
+    if media.empty or pd.isna(media['media'].iloc[0]):
+        return 0.0
+    return float(media['media'].iloc[0])
+
+def get_text_answers(col):
+    """Busca as respostas descritivas não nulas de uma coluna."""
+    df = run_query(
+        f"SELECT {col} FROM respostas_questionario_quilombola WHERE {col} IS NOT NULL;",
+        refresh_cache(),
+    )
+    return df[col].tolist() if not df.empty else []
+
+# --- Construção dos Gráficos ---
+# Define as paletas de cores.
+GREEN_COLOR = "#2ca02c"
+QUALITATIVE_COLORS = px.colors.qualitative.D3
+BAR_COLOR_1 = px.colors.sequential.Purples[4]
+BAR_COLOR_2 = px.colors.sequential.Oranges[4]
+BAR_COLOR_3 = px.colors.sequential.Reds[4]
+BAR_COLOR_4 = px.colors.sequential.Blues[4]
+BAR_COLOR_5 = px.colors.sequential.Blues[6]
+
+# As figuras ficam em cache pelo conteúdo das contagens agregadas, então
+# uma nova execução do script só as reconstrói quando os dados mudam. O hash
+# depende da ordem das linhas, e cada gráfico guarda poucas versões antigas.
+COUNTS_HASH_FUNCS = {
+    pd.DataFrame: lambda d: pd.util.hash_pandas_object(d).to_numpy().tobytes(),
+    pd.Series: lambda s: pd.util.hash_pandas_object(s).to_numpy().tobytes(),
+}
+FIG_CACHE_ENTRIES = 4
+
+@st.cache_resource(hash_funcs=COUNTS_HASH_FUNCS, max_entries=FIG_CACHE_ENTRIES)
+def build_uni_fig(uni_counts):
+    """Monta o gráfico de respostas por universidade."""
+    fig_uni = px.bar(uni_counts, x='Universidade', y='Quantidade',
+                     text='Quantidade', title="Respostas por Universidade",
+                     color_discrete_sequence=[GREEN_COLOR])
+    fig_uni.update_traces(textposition='outside')
+    return fig_uni
+
+@st.cache_resource(hash_funcs=COUNTS_HASH_FUNCS, max_entries=FIG_CACHE_ENTRIES)
+def build_curso_fig(curso_counts):
+    """Monta o gráfico de pizza de respostas por curso."""
+    fig_curso = px.pie(curso_counts, names='Curso', values='Quantidade',
+                       title="Respostas por Curso",
+                       color_discrete_sequence=QUALITATIVE_COLORS)
+    
+    fig_curso.update_traces(textposition='outside',
+                            textinfo='percent+label',
+                            selector=dict(type='pie'))
+
+    # ✅ Correção aplicada aqui
+    fig_curso.update_layout(
+        margin=dict(l=50, r=50, b=150, t=50),
+        showlegend=False
+    )
+    return fig_curso
+
+@st.cache_resource(hash_funcs=COUNTS_HASH_FUNCS, max_entries=FIG_CACHE_ENTRIES)
+def build_acesso_fig(df_acesso):
+    """Monta o gráfico das formas de acesso à leitura na comunidade."""
+    fig_acesso = px.bar(df_acesso, x='Forma de Acesso', y='Quantidade',
+                        title="Como acessava o livro e a leitura na comunidade",
+                        text='Quantidade', color_discrete_sequence=[BAR_COLOR_1])
+    fig_acesso.update_traces(textposition='outside')
+    return fig_acesso
+
+@st.cache_resource(hash_funcs=COUNTS_HASH_FUNCS, max_entries=FIG_CACHE_ENTRIES)
+def build_equip_fig(df_equip):
+    """Monta o gráfico dos equipamentos utilizados antes da universidade."""
+    fig_equip = px.bar(df_equip, x='Equipamento', y='Quantidade',
+                       title="Equipamentos utilizados para acessar leitura",
+                       text='Quantidade', color_discrete_sequence=[BAR_COLOR_2])
+    fig_equip.update_traces(textposition='outside')
+    return fig_equip
+
+@st.cache_resource(hash_funcs=COUNTS_HASH_FUNCS, max_entries=FIG_CACHE_ENTRIES)
+def build_internet_fig(internet_counts):
+    """Monta o funil da qualidade do acesso à internet na comunidade."""
+    return px.funnel(internet_counts, x='Quantidade', y='Avaliação',
+                     title="Como é o acesso à internet na comunidade",
+                     color_discrete_sequence=[BAR_COLOR_3])
+
+@st.cache_resource(hash_funcs=COUNTS_HASH_FUNCS, max_entries=FIG_CACHE_ENTRIES)
+def build_tec_uni_fig(tec_uni_counts):
+    """Monta o gráfico da avaliação dos recursos tecnológicos na universidade."""
+    fig_tec_uni = px.bar(tec_uni_counts, y='Avaliação', x='Quantidade', orientation='h',
+                         title="Avaliação dos recursos tecnológicos na universidade",
+                         text='Quantidade', color_discrete_sequence=[BAR_COLOR_4])
+    fig_tec_uni.update_traces(textposition='outside')
+    return fig_tec_uni
+
+@st.cache_resource(hash_funcs=COUNTS_HASH_FUNCS, max_entries=FIG_CACHE_ENTRIES)
+def build_freq_acesso_fig(freq_acesso_counts):
+    """Monta o gráfico da frequência geral de acesso ao livro e leitura."""
+    fig_freq_acesso = px.bar(freq_acesso_counts, x=freq_acesso_counts.index, y=freq_acesso_counts.values,
+                             labels={'x': 'Frequência', 'y': 'Quantidade'},
+                             title="Frequência geral de acesso ao livro e leitura",
+                             text=freq_acesso_counts.values, color_discrete_sequence=[BAR_COLOR_5])
+    fig_freq_acesso.update_traces(textposition='outside')
+    return fig_freq_acesso
+
+@st.cache_resource(hash_funcs=COUNTS_HASH_FUNCS, max_entries=FIG_CACHE_ENTRIES)
+def build_freq_longos_fig(freq_longos_counts):
+    """Monta o gráfico da frequência de leitura de textos longos."""
+    fig_freq_longos = px.bar(freq_longos_counts, x=freq_longos_counts.index, y=freq_longos_counts.values,
+                              labels={'x': 'Frequência', 'y': 'Quantidade'},
+                              title="Frequência de leitura de textos longos",
+                              color_discrete_sequence=[GREEN_COLOR])
+    fig_freq_longos.update_traces(textposition='outside')
+    return fig_freq_longos
 
 # --- Interface do Dashboard ---
 st.title("📊 Dashboard de Análise da Pesquisa do TCC")
 st.markdown("Visualização interativa das respostas do questionário sobre tecnologia e práticas leitoras.")
 
+# --- Carregamento dos Dados ---
+counts_all = get_dashboard_aggs()
+if refresh_error() is not None and not counts_all.empty:
+    st.warning(f"Não foi possível atualizar os dados; exibindo a última cópia salva: {refresh_error()}")
+
 # --- Processamento e Exibição dos Gráficos ---
-if df.empty:
+if counts_all.empty or counts_all.sum() == 0:
     st.warning("Nenhum dado encontrado no banco de dados ou a conexão falhou. Verifique as configurações.")
 else:
-    # Define a ordem das respostas para os gráficos de frequência.
-    ORDER_MAP = ["Nunca", "Raramente", "Ocasionalmente", "Frequentemente", "Muito frequentemente"]
-
-    # Define as paletas de cores.
-    GREEN_COLOR = "#2ca02c"
-    QUALITATIVE_COLORS = px.colors.qualitative.D3
-    BAR_COLOR_1 = px.colors.sequential.Purples[4]
-    BAR_COLOR_2 = px.colors.sequential.Oranges[4]
-    BAR_COLOR_3 = px.colors.sequential.Reds[4]
-    BAR_COLOR_4 = px.colors.sequential.Blues[4]
-    BAR_COLOR_5 = px.colors.sequential.Blues[6]
-
     # --- Seção: Perfil dos Participantes ---
     st.header("👤 Perfil dos Participantes")
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("Distribuição por Universidade")
-        uni_counts = df['universidade'].value_counts().reset_index()
+        uni_counts = column_counts(counts_all, 'universidade').reset_index()
         uni_counts.columns = ['Universidade', 'Quantidade']
-        fig_uni = px.bar(uni_counts, x='Universidade', y='Quantidade',
-                         text='Quantidade', title="Respostas por Universidade",
-                         color_discrete_sequence=[GREEN_COLOR])
-        fig_uni.update_traces(textposition='outside')
-        st.plotly_chart(fig_uni, use_container_width=True)
+        st.plotly_chart(build_uni_fig(uni_counts), use_container_width=True)
 
     with col2:
         st.subheader("Distribuição por Curso")
-        df['curso_normalizado'] = df['curso'].astype(str).str.lower().str.strip().str.title()
+        curso_counts = column_counts(counts_all, 'curso').reset_index()
+        curso_counts.columns = ['k', 'n']
+        curso_counts['k'] = curso_counts['k'].str.strip().str.title()
+        curso_counts = curso_counts.groupby('k', as_index=False)['n'].sum().sort_values('n', ascending=False)
         
-        curso_counts = df['curso_normalizado'].value_counts().reset_index()
         curso_counts.columns = ['Curso', 'Quantidade']
-        
-        fig_curso = px.pie(curso_counts, names='Curso', values='Quantidade',
-                           title="Respostas por Curso",
-                           color_discrete_sequence=QUALITATIVE_COLORS)
-        
-        fig_curso.update_traces(textposition='outside',
-                                textinfo='percent+label',
-                                selector=dict(type='pie'))
-
-        # ✅ Correção aplicada aqui
-        fig_curso.update_layout(
-            margin=dict(l=50, r=50, b=150, t=50),
-            showlegend=False
-        )
-        
-        st.plotly_chart(fig_curso, use_container_width=True)
+        st.plotly_chart(build_curso_fig(curso_counts), use_container_width=True)
 
     # --- Seção: Acesso à Leitura e Equipamentos ---
     st.header("📚 Acesso à Leitura e Equipamentos")
@@ -96,25 +363,15 @@ else:
 
     with col3:
         st.subheader("Formas de Acesso à Leitura na Comunidade")
-        acesso_list = [item.strip() for sublist in df['acesso_leitura_comunidade'].dropna().str.split(',') for item in sublist]
-        acesso_counts = Counter(acesso_list)
-        df_acesso = pd.DataFrame(acesso_counts.items(), columns=['Forma de Acesso', 'Quantidade']).sort_values('Quantidade', ascending=False)
-        fig_acesso = px.bar(df_acesso, x='Forma de Acesso', y='Quantidade',
-                            title="Como acessava o livro e a leitura na comunidade",
-                            text='Quantidade', color_discrete_sequence=[BAR_COLOR_1])
-        fig_acesso.update_traces(textposition='outside')
-        st.plotly_chart(fig_acesso, use_container_width=True)
+        df_acesso = column_counts(counts_all, 'acesso_leitura_comunidade').reset_index()
+        df_acesso.columns = ['Forma de Acesso', 'Quantidade']
+        st.plotly_chart(build_acesso_fig(df_acesso), use_container_width=True)
 
     with col4:
         st.subheader("Equipamentos Utilizados Antes da Universidade")
-        equip_list = [item.strip() for sublist in df['equipamentos_utilizados'].dropna().str.split(',') for item in sublist]
-        equip_counts = Counter(equip_list)
-        df_equip = pd.DataFrame(equip_counts.items(), columns=['Equipamento', 'Quantidade']).sort_values('Quantidade', ascending=False)
-        fig_equip = px.bar(df_equip, x='Equipamento', y='Quantidade',
-                           title="Equipamentos utilizados para acessar leitura",
-                           text='Quantidade', color_discrete_sequence=[BAR_COLOR_2])
-        fig_equip.update_traces(textposition='outside')
-        st.plotly_chart(fig_equip, use_container_width=True)
+        df_equip = column_counts(counts_all, 'equipamentos_utilizados').reset_index()
+        df_equip.columns = ['Equipamento', 'Quantidade']
+        st.plotly_chart(build_equip_fig(df_equip), use_container_width=True)
 
     # --- Seção: Acesso à Internet e Avaliações ---
     st.header("💻 Acesso à Internet e Avaliações")
@@ -122,69 +379,60 @@ else:
 
     with col5:
         st.subheader("Qualidade do Acesso à Internet na Comunidade")
-        internet_counts = df['acesso_internet_comunidade'].value_counts().reset_index()
+        internet_counts = column_counts(counts_all, 'acesso_internet_comunidade').reset_index()
         internet_counts.columns = ['Avaliação', 'Quantidade']
-        fig_internet = px.funnel(internet_counts, x='Quantidade', y='Avaliação',
-                                 title="Como é o acesso à internet na comunidade",
-                                 color_discrete_sequence=[BAR_COLOR_3])
-        st.plotly_chart(fig_internet, use_container_width=True)
+        st.plotly_chart(build_internet_fig(internet_counts), use_container_width=True)
 
     with col6:
         st.subheader("Avaliação dos Recursos Tecnológicos na Universidade")
-        tec_uni_counts = df['avaliacao_tecnologia_universidade'].value_counts().reset_index()
+        tec_uni_counts = column_counts(counts_all, 'avaliacao_tecnologia_universidade').reset_index()
         tec_uni_counts.columns = ['Avaliação', 'Quantidade']
-        fig_tec_uni = px.bar(tec_uni_counts, y='Avaliação', x='Quantidade', orientation='h',
-                             title="Avaliação dos recursos tecnológicos na universidade",
-                             text='Quantidade', color_discrete_sequence=[BAR_COLOR_4])
-        fig_tec_uni.update_traces(textposition='outside')
-        st.plotly_chart(fig_tec_uni, use_container_width=True)
+        st.plotly_chart(build_tec_uni_fig(tec_uni_counts), use_container_width=True)
 
     # --- Seção: Frequência de Práticas Leitoras ---
     st.header("Frequência de Práticas Leitoras")
 
     st.subheader("Frequência de Acesso a Livros e Leitura (Pós-Universidade)")
-    freq_acesso_counts = df['frequencia_acesso_geral'].value_counts().reindex(ORDER_MAP).fillna(0)
-    fig_freq_acesso = px.bar(freq_acesso_counts, x=freq_acesso_counts.index, y=freq_acesso_counts.values,
-                             labels={'x': 'Frequência', 'y': 'Quantidade'},
-                             title="Frequência geral de acesso ao livro e leitura",
-                             text=freq_acesso_counts.values, color_discrete_sequence=[BAR_COLOR_5])
-    fig_freq_acesso.update_traces(textposition='outside')
-    st.plotly_chart(fig_freq_acesso, use_container_width=True)
+    freq_acesso_counts = column_counts(counts_all, 'frequencia_acesso_geral')
+    st.plotly_chart(build_freq_acesso_fig(freq_acesso_counts), use_container_width=True)
 
     st.subheader("Frequência de Leitura de Textos Longos (+20 páginas)")
-    freq_longos_counts = df['frequencia_leitura_textos_longos'].value_counts().reindex(ORDER_MAP).fillna(0)
-    fig_freq_longos = px.bar(freq_longos_counts, x=freq_longos_counts.index, y=freq_longos_counts.values,
-                              labels={'x': 'Frequência', 'y': 'Quantidade'},
-                              title="Frequência de leitura de textos longos",
-                              color_discrete_sequence=[GREEN_COLOR])
-    fig_freq_longos.update_traces(textposition='outside')
-    st.plotly_chart(fig_freq_longos, use_container_width=True)
+    freq_longos_counts = column_counts(counts_all, 'frequencia_leitura_textos_longos')
+    st.plotly_chart(build_freq_longos_fig(freq_longos_counts), use_container_width=True)
 
     # --- Seção: Respostas Descritivas ---
     st.header("📝 Respostas Descritivas")
     with st.expander("Ver justificativas sobre a leitura de textos longos"):
-        justificativas = df['justificativa_leitura_longa'].dropna().tolist()
-        for i, just in enumerate(justificativas):
-            st.info(f"**Resposta {i+1}:** {just}")
+        st.checkbox("Carregar justificativas", key="show_justificativas")
+        if st.session_state.get("show_justificativas"):
+            justificativas = get_text_answers('justificativa_leitura_longa')
+            if justificativas:
+                st.info("\n\n".join(f"**Resposta {i+1}:** {just}" for i, just in enumerate(justificativas)))
 
     with st.expander("Ver experiências antes e depois da universidade"):
-        experiencias = df['experiencia_antes_depois'].dropna().tolist()
-        for i, exp in enumerate(experiencias):
-            st.success(f"**Resposta {i+1}:** {exp}")
+        st.checkbox("Carregar experiências", key="show_experiencias")
+        if st.session_state.get("show_experiencias"):
+            experiencias = get_text_answers('experiencia_antes_depois')
+            if experiencias:
+                st.success("\n\n".join(f"**Resposta {i+1}:** {exp}" for i, exp in enumerate(experiencias)))
 
     # --- Seção: Raw Data ---
     st.header("📄 Tabela de Dados Brutos")
     with st.expander("Clique para ver a tabela de dados completa"):
-        st.dataframe(df)
+        st.checkbox("Carregar tabela", key="show_raw")
+        if st.session_state.get("show_raw"):
+            df_full = run_query_full()
+            st.caption(f"Exibindo as primeiras {min(RAW_PREVIEW_ROWS, len(df_full))} de {len(df_full)} respostas.")
+            st.dataframe(df_full.head(RAW_PREVIEW_ROWS))
+            st.download_button("Baixar tabela completa (CSV)", raw_data_csv(),
+                               file_name="respostas_questionario_quilombola.csv", mime="text/csv")
     # --- Seção: Média de Respostas por Comunidade ---
     st.header("🏘️ Média de Respostas por Comunidade")
 
-    respostas_por_comunidade = df['comunidade_natal'].value_counts().reset_index()
-    respostas_por_comunidade.columns = ['Comunidade', 'Total de Respostas']
-    
-    media_geral = respostas_por_comunidade['Total de Respostas'].mean()
+    comunidades = column_counts(counts_all, 'comunidade_natal').reset_index()
+    comunidades.columns = ['Comunidade', 'Total de Respostas']
 
-    st.markdown(f"**Média geral de respostas por comunidade:** `{media_geral:.2f}`")
+    st.markdown(f"**Média geral de respostas por comunidade:** `{media_geral_respostas():.2f}`")
 
-    st.dataframe(respostas_por_comunidade)
+    st.dataframe(comunidades)
 # 
\ No newline at end of file